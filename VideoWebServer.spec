@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=['waitress', 'psutil', 'pystray', 'PIL', 'PIL.Image', 'PIL.ImageDraw'],
+    hiddenimports=['waitress', 'psutil', 'pystray', 'PIL', 'PIL.Image', 'PIL.ImageDraw', 'orjson'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -35,6 +35,7 @@ pyinstaller --clean ^
     --hidden-import=PIL ^
     --hidden-import=PIL.Image ^
     --hidden-import=PIL.ImageDraw ^
+    --hidden-import=orjson ^
     super_badass_videos_web_server.py
 
 if errorlevel 1 (
@@ -4,7 +4,9 @@
 """
 
 from flask import Flask, send_file, request, jsonify, render_template_string, session
+from werkzeug.http import http_date, is_resource_modified, quote_etag
 import os
+import stat
 import secrets
 import time
 import configparser
@@ -13,20 +15,44 @@ import sys
 import psutil
 import ctypes
 import socket
+import select
 import threading
+import heapq
+import itertools
+import math
+import functools
+import gzip
+import hashlib
 import webbrowser
 import requests
-import multiprocessing
+import orjson
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime
 from PIL import Image, ImageDraw
 import pystray
 from waitress import serve
+from waitress.buffers import ReadOnlyFileBasedBuffer
 
 app = Flask(__name__)
 app.secret_key = secrets.token_hex(32)
 
+def not_modified_or(etag, build_body):
+    """频繁轮询的JSON接口共用的条件请求处理
+    
+    etag与If-None-Match一致时返回304，不生成正文；否则调用build_body()得到JSON字节串。
+    两种响应都带private, no-cache，浏览器每次使用缓存前都回到服务器验证。
+    """
+    if etag in request.if_none_match:
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(build_body(), mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
 # 分块传输配置
-CHUNK_SIZE = 65536  # 64KB分块大小
+CHUNK_SIZE = 1024 * 1024  # 1MB分块大小
 
 # 获取程序所在目录（兼容打包后的exe和Python脚本）
 if getattr(sys, 'frozen', False):
@@ -35,7 +61,6 @@ else:
     application_path = os.path.dirname(os.path.abspath(__file__))
 
 # 配置文件管理
-config = configparser.ConfigParser()
 config_path = os.path.join(application_path, 'config.ini')
 
 DEFAULT_CONFIG = {
@@ -80,29 +105,54 @@ def create_default_config(config_path):
         f.write('# 监控页面密码（留空则不需要认证）\n')
         f.write(f'monitor_password = {DEFAULT_CONFIG["monitor_password"]}\n')
 
+@dataclass(frozen=True)
+class Settings:
+    """config.ini的解析结果，启动时加载一次"""
+    video_root: str
+    secret_video_root: str
+    search_trigger: str
+    password: str
+    port: int
+    monitor_username: str
+    monitor_password: str
+
+def resolve_folder(path):
+    """把配置中的文件夹路径转换为绝对路径（相对路径以程序所在目录为基准）"""
+    if not os.path.isabs(path):
+        return os.path.join(application_path, path)
+    return os.path.abspath(path)
+
+def load_settings(config_path):
+    """读取配置文件，缺失的项使用默认值，一次性解析为Settings"""
+    config = configparser.ConfigParser()
+    config.read(config_path, encoding='utf-8')
+    
+    values = dict(DEFAULT_CONFIG)
+    if config.has_section('Settings'):
+        values.update(config['Settings'])
+    
+    return Settings(
+        video_root=resolve_folder(values['share_folder']),
+        secret_video_root=resolve_folder(values['secret_folder']),
+        search_trigger=values['search_trigger'],
+        password=values['password'],
+        port=int(values['port']),
+        monitor_username=values['monitor_username'],
+        monitor_password=values['monitor_password']
+    )
+
 # 初始化配置
 if not os.path.exists(config_path):
     create_default_config(config_path)
 
-config.read(config_path, encoding='utf-8')
-VIDEO_ROOT = config.get('Settings', 'share_folder', fallback=DEFAULT_CONFIG['share_folder'])
-SECRET_VIDEO_ROOT = config.get('Settings', 'secret_folder', fallback=DEFAULT_CONFIG['secret_folder'])
-SEARCH_TRIGGER = config.get('Settings', 'search_trigger', fallback=DEFAULT_CONFIG['search_trigger'])
-SECRET_PASSWORD = config.get('Settings', 'password', fallback=DEFAULT_CONFIG['password'])
-PORT = config.getint('Settings', 'port', fallback=int(DEFAULT_CONFIG['port']))
-MONITOR_USERNAME = config.get('Settings', 'monitor_username', fallback=DEFAULT_CONFIG['monitor_username'])
-MONITOR_PASSWORD = config.get('Settings', 'monitor_password', fallback=DEFAULT_CONFIG['monitor_password'])
-
-# 转换为绝对路径
-if not os.path.isabs(VIDEO_ROOT):
-    VIDEO_ROOT = os.path.join(application_path, VIDEO_ROOT)
-else:
-    VIDEO_ROOT = os.path.abspath(VIDEO_ROOT)
-
-if not os.path.isabs(SECRET_VIDEO_ROOT):
-    SECRET_VIDEO_ROOT = os.path.join(application_path, SECRET_VIDEO_ROOT)
-else:
-    SECRET_VIDEO_ROOT = os.path.abspath(SECRET_VIDEO_ROOT)
+SETTINGS = load_settings(config_path)
+VIDEO_ROOT = SETTINGS.video_root
+SECRET_VIDEO_ROOT = SETTINGS.secret_video_root
+SEARCH_TRIGGER = SETTINGS.search_trigger
+SECRET_PASSWORD = SETTINGS.password
+PORT = SETTINGS.port
+MONITOR_USERNAME = SETTINGS.monitor_username
+MONITOR_PASSWORD = SETTINGS.monitor_password
 
 # 自动创建文件夹
 if not os.path.exists(VIDEO_ROOT):
@@ -113,6 +163,9 @@ if not os.path.exists(SECRET_VIDEO_ROOT):
 # Token管理：{token: {'expire_time': timestamp, 'used_time': timestamp or None}}
 valid_tokens = {}
 TOKEN_USED_CLEANUP_TIME = 3600  # Token清理时间1小时
+# Token清理时间的最小堆：[(清理时间, token)]，Token状态变化时重新入堆
+token_expiry_heap = []
+token_heap_lock = threading.Lock()
 
 # 客户端唯一ID管理
 client_id_counter = 0
@@ -129,106 +182,222 @@ def generate_client_id():
             client_id_counter = 0
     return str(client_id)
 
-# 连接监控
-active_connections = {}
+# 连接注册序号，监控页按它排列客户端（调用方需持有connection_lock）
+connection_seq = itertools.count()
+
+class ConnectionInfo:
+    """单个客户端的连接状态；用__slots__代替dict，FIELDS的顺序即监控数据的字段顺序"""
+    FIELDS = ('client_id', 'client_ip', 'client_port', 'server_ip', 'interface',
+              'video', 'position', 'duration', 'bandwidth_down', 'bandwidth_up',
+              'last_seen', 'connected_at')
+    __slots__ = FIELDS + ('seq',)
+
+    def __init__(self, client_id, client_ip, client_port, server_ip, interface):
+        self.seq = next(connection_seq)
+        self.client_id = client_id
+        self.client_ip = client_ip
+        self.client_port = client_port
+        self.server_ip = server_ip
+        self.interface = interface
+        self.video = '未播放'
+        self.position = 0
+        self.duration = 0
+        self.bandwidth_down = 0
+        self.bandwidth_up = 0
+        self.last_seen = time.time()
+        self.connected_at = format_current_time()
+
+    def snapshot(self):
+        """按FIELDS顺序返回监控数据各字段值的元组"""
+        return tuple(getattr(self, name) for name in self.FIELDS)
+
+# 连接监控：按last_seen从旧到新排列，更新心跳时移到末尾，过期清理只需从头部弹出
+active_connections = OrderedDict()
 connection_lock = threading.Lock()
+# 连接数变化（新增、过期、淘汰）时置位，托盘提示线程据此刷新
+connections_changed = threading.Event()
 CONNECTION_TIMEOUT = 20  # 心跳超时时间改为20秒
 HEARTBEAT_INTERVAL = 10  # 心跳间隔10秒
 MAX_CONNECTIONS = 100
+TRACK_REFRESH_INTERVAL = 1  # 同一客户端1秒内的请求不重复刷新心跳
+# waitress同时保持的TCP连接上限：每个观看者通常有页面、视频、心跳多条长连接，
+# 默认的100很快用完；取400是为了留在Windows上select()的512个套接字限制之内
+SERVER_CONNECTION_LIMIT = MAX_CONNECTIONS * 4
+UNTRACKED_PATH_PREFIXES = ('/monitor', '/assets/', '/favicon.ico')
 cleanup_thread = None
 
 # 系统托盘
 tray_icon = None
 
-# 网卡信息缓存
+# 网卡信息缓存：刷新时整体替换字典，查询时无需加锁
 ip_to_interface_cache = {}
 interface_cache_lock = threading.Lock()
 interface_cache_last_update = 0
 INTERFACE_CACHE_EXPIRE = 60
 
-def get_interface_name(server_ip):
-    """获取IP对应的网卡名称，使用缓存提升性能"""
-    global interface_cache_last_update
-    current_time = time.time()
+def enum_ipv4_interfaces():
+    """列出本机所有IPv4地址，返回[(网卡名称, IP地址)]
     
-    with interface_cache_lock:
-        if current_time - interface_cache_last_update > INTERFACE_CACHE_EXPIRE:
-            # 重建缓存
-            ip_to_interface_cache.clear()
+    psutil在Windows上即调用GetAdaptersAddresses，在Linux上即调用getifaddrs，
+    这里只取IPv4地址，网卡缓存和访问地址列表共用这一次枚举。
+    """
+    return [(iface, addr.address)
+            for iface, addrs in psutil.net_if_addrs().items()
+            for addr in addrs
+            if addr.family == socket.AF_INET]
+
+def refresh_interface_cache():
+    """重建IP到网卡名称的映射"""
+    global ip_to_interface_cache, interface_cache_last_update
+    try:
+        new_cache = {ip: iface for iface, ip in enum_ipv4_interfaces()}
+    except Exception:
+        new_cache = {}
+    ip_to_interface_cache = new_cache
+    interface_cache_last_update = time.time()
+
+def get_interface_name(server_ip):
+    """获取IP对应的网卡名称，缓存过期时只由一个线程刷新，其他线程继续使用旧数据"""
+    if time.time() - interface_cache_last_update > INTERFACE_CACHE_EXPIRE:
+        if interface_cache_lock.acquire(blocking=False):
             try:
-                for iface, addrs in psutil.net_if_addrs().items():
-                    for addr in addrs:
-                        if addr.family == socket.AF_INET:
-                            ip_to_interface_cache[addr.address] = iface
-            except:
-                pass
-            interface_cache_last_update = current_time
-        
-        return ip_to_interface_cache.get(server_ip, "未知接口")
+                if time.time() - interface_cache_last_update > INTERFACE_CACHE_EXPIRE:
+                    refresh_interface_cache()
+            finally:
+                interface_cache_lock.release()
+    
+    return ip_to_interface_cache.get(server_ip, "未知接口")
 
 # 视频列表缓存
+VIDEO_EXTENSIONS = frozenset({'mp4', 'webm', 'ogg', 'mkv', 'rmvb', 'avi', 'flv', 'mov', 'wmv'})
+
+# 扩展名 -> MIME类型，未列出的扩展名按video/mp4返回
+MIME_TYPES = {
+    'mp4': 'video/mp4',
+    'webm': 'video/webm',
+    'ogg': 'video/ogg',
+    'mkv': 'video/x-matroska',
+    'rmvb': 'application/vnd.rn-realmedia-vbr',
+    'avi': 'video/x-msvideo',
+    'flv': 'video/x-flv',
+    'mov': 'video/quicktime'
+}
+
+# files为不可变元组，可直接返回给调用方，无需每次复制
+# dir_mtimes: {目录路径: st_mtime_ns}，目录增删文件时修改时间会变化，据此判断缓存是否失效
+# etag: 列表内容的摘要，重新扫描时一并更新，供/videos做条件请求
 video_list_cache = {
-    'normal': {'files': [], 'last_update': 0},
-    'secret': {'files': [], 'last_update': 0}
+    'normal': {'files': (), 'dir_mtimes': {}, 'etag': ''},
+    'secret': {'files': (), 'dir_mtimes': {}, 'etag': ''}
 }
 video_cache_lock = threading.Lock()
-VIDEO_CACHE_EXPIRE = 300  # 缓存5分钟
+
+def scan_video_files(video_root):
+    """用os.scandir遍历视频目录，返回视频相对路径元组和各目录的修改时间"""
+    video_files = []
+    dir_mtimes = {}
+    stack = [(video_root, '')]
+    
+    while stack:
+        base, rel_dir = stack.pop()
+        subdirs = []
+        try:
+            # 先记录修改时间再扫描，扫描期间的变化会在下次检查时触发重建
+            dir_mtimes[base] = os.stat(base).st_mtime_ns
+            with os.scandir(base) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        if not entry.is_symlink():
+                            subdirs.append((entry.path, rel_dir + entry.name + '/'))
+                    else:
+                        # 只对扩展名部分转小写，集合查找代替逐个后缀比较
+                        _, dot, ext = entry.name.rpartition('.')
+                        if dot and ext.lower() in VIDEO_EXTENSIONS:
+                            video_files.append(rel_dir + entry.name)
+        except OSError:
+            continue
+        # 逆序入栈，保持与os.walk相同的遍历顺序
+        stack.extend(reversed(subdirs))
+    
+    return tuple(video_files), dir_mtimes
+
+def video_dirs_unchanged(dir_mtimes):
+    """检查扫描过的目录修改时间是否都没有变化"""
+    for path, mtime in dir_mtimes.items():
+        try:
+            if os.stat(path).st_mtime_ns != mtime:
+                return False
+        except OSError:
+            return False
+    return True
 
 def get_video_list(is_secret=False, force_refresh=False):
-    """获取视频列表，使用缓存减少文件系统扫描"""
+    """获取视频列表，目录未变化时直接使用缓存，避免重复扫描文件系统"""
+    return get_video_list_with_etag(is_secret, force_refresh)[0]
+
+def get_video_list_with_etag(is_secret=False, force_refresh=False):
+    """获取视频列表及其ETag，两者取自同一次扫描，保证一致"""
     cache_key = 'secret' if is_secret else 'normal'
-    current_time = time.time()
     
     with video_cache_lock:
         cache_data = video_list_cache[cache_key]
-        if not force_refresh and cache_data['files'] and (current_time - cache_data['last_update']) < VIDEO_CACHE_EXPIRE:
-            return cache_data['files'].copy()
+        cached_files = cache_data['files']
+        cached_mtimes = cache_data['dir_mtimes']
+        cached_etag = cache_data['etag']
+    
+    if not force_refresh and cached_mtimes and video_dirs_unchanged(cached_mtimes):
+        return cached_files, cached_etag
     
     # 重新扫描文件系统
     video_root = SECRET_VIDEO_ROOT if is_secret else VIDEO_ROOT
-    video_files = []
-    
-    if not os.path.exists(video_root):
-        with video_cache_lock:
-            video_list_cache[cache_key]['files'] = []
-            video_list_cache[cache_key]['last_update'] = current_time
-        return video_files
-    
-    for root, dirs, files in os.walk(video_root):
-        for file in files:
-            if file.lower().endswith(('.mp4', '.webm', '.ogg', '.mkv', '.rmvb', '.avi', '.flv', '.mov', '.wmv')):
-                rel_dir = os.path.relpath(root, video_root)
-                rel_file = os.path.join(rel_dir, file) if rel_dir != '.' else file
-                video_files.append(rel_file.replace('\\', '/'))
+    video_files, dir_mtimes = scan_video_files(video_root)
+    etag = hashlib.md5('\n'.join(video_files).encode('utf-8')).hexdigest()[:16]
     
     with video_cache_lock:
         video_list_cache[cache_key]['files'] = video_files
-        video_list_cache[cache_key]['last_update'] = current_time
+        video_list_cache[cache_key]['dir_mtimes'] = dir_mtimes
+        video_list_cache[cache_key]['etag'] = etag
     
-    return video_files
+    return video_files, etag
+
+def token_deadline(token_info):
+    """计算Token应被清理的时间，永久有效的Token返回None"""
+    if isinstance(token_info, (int, float)):
+        return token_info if token_info > 0 else None
+    if isinstance(token_info, dict):
+        used_time = token_info.get('used_time')
+        if used_time is not None:
+            return used_time + TOKEN_USED_CLEANUP_TIME
+        expire_time = token_info.get('expire_time', 0)
+        return expire_time if expire_time > 0 else None
+    return None
+
+def schedule_token_cleanup(token):
+    """按Token当前状态把清理时间加入最小堆"""
+    deadline = token_deadline(valid_tokens.get(token))
+    if deadline is not None:
+        with token_heap_lock:
+            heapq.heappush(token_expiry_heap, (deadline, token))
+
+def next_token_deadline():
+    """返回最近一个Token清理时间，没有则返回None"""
+    with token_heap_lock:
+        return token_expiry_heap[0][0] if token_expiry_heap else None
 
 def clean_expired_tokens():
-    """清理过期和已使用的Token"""
+    """清理过期和已使用的Token，只弹出堆顶已到期的记录"""
     current_time = time.time()
-    expired = []
-    
-    for token, token_info in valid_tokens.items():
-        if isinstance(token_info, (int, float)):
-            if token_info > 0 and current_time > token_info:
-                expired.append(token)
-        elif isinstance(token_info, dict):
-            expire_time = token_info.get('expire_time', 0)
-            used_time = token_info.get('used_time')
-            
-            if used_time is None and expire_time > 0 and current_time > expire_time:
-                expired.append(token)
-            elif used_time is not None and current_time > used_time + TOKEN_USED_CLEANUP_TIME:
-                expired.append(token)
+    cleaned = 0
     
-    for token in expired:
-        del valid_tokens[token]
+    with token_heap_lock:
+        while token_expiry_heap and token_expiry_heap[0][0] < current_time:
+            deadline, token = heapq.heappop(token_expiry_heap)
+            # 状态变化后旧记录仍留在堆中，只有与当前状态一致的记录才清理
+            if token in valid_tokens and token_deadline(valid_tokens[token]) == deadline:
+                valid_tokens.pop(token, None)
+                cleaned += 1
     
-    return len(expired)
+    return cleaned
 
 def is_token_valid(token):
     """检查Token是否有效，包括已使用的Token"""
@@ -262,12 +431,7 @@ def cleanup_expired_connections():
             with connection_lock:
                 connection_count = len(active_connections)
                 # 清理超过20秒未心跳的客户端
-                expired = [client_id for client_id, info in active_connections.items() 
-                          if current_time - info.get('last_seen', 0) > CONNECTION_TIMEOUT]
-                
-                if expired:
-                    for client_id in expired:
-                        del active_connections[client_id]
+                remove_expired_connections(current_time)
             
             cleaned_tokens = clean_expired_tokens()
             
@@ -281,25 +445,54 @@ def cleanup_expired_connections():
             else:
                 sleep_time = 300
             
+            # 有Token即将到期时提前醒来
+            next_deadline = next_token_deadline()
+            if next_deadline is not None:
+                sleep_time = min(sleep_time, max(1, next_deadline - time.time()))
+            
             time.sleep(sleep_time)
             
         except Exception as e:
             time.sleep(60)
 
-def cleanup_oldest_connections(count=10):
-    """清理最旧的连接，释放空间"""
-    with connection_lock:
-        if len(active_connections) >= MAX_CONNECTIONS:
-            sorted_connections = sorted(active_connections.items(), 
-                                       key=lambda x: x[1].get('last_seen', 0))
-            for client_id, _ in sorted_connections[:count]:
-                del active_connections[client_id]
+# 连接时间字符串缓存：(整秒时间戳, 格式化结果)，同一秒内直接复用
+timestamp_cache = (0, '')
+
+def format_current_time():
+    """返回当前时间的'%Y-%m-%d %H:%M:%S'字符串，每秒只格式化一次"""
+    global timestamp_cache
+    now = int(time.time())
+    cached_second, cached_text = timestamp_cache
+    if now != cached_second:
+        cached_text = datetime.fromtimestamp(now).strftime('%Y-%m-%d %H:%M:%S')
+        timestamp_cache = (now, cached_text)
+    return cached_text
+
+def remove_expired_connections(current_time):
+    """移除超时未心跳的客户端（调用方需持有connection_lock），只处理过期的部分"""
+    while active_connections:
+        oldest = next(iter(active_connections.values()))
+        if current_time - oldest.last_seen <= CONNECTION_TIMEOUT:
+            break
+        active_connections.popitem(last=False)
+        connections_changed.set()
+
+def evict_oldest_connections(count):
+    """移除最旧的count个连接（调用方需持有connection_lock）"""
+    for _ in range(min(count, len(active_connections))):
+        active_connections.popitem(last=False)
+        connections_changed.set()
+
+def touch_connection(client_id, info):
+    """刷新心跳时间并移到队尾（调用方需持有connection_lock）"""
+    info.last_seen = time.time()
+    active_connections.move_to_end(client_id)
 
 @app.before_request
 def track_connection():
     """跟踪和记录客户端连接信息"""
-    # 不监控 /monitor 和 /monitor-data 请求
-    if request.path.startswith('/monitor'):
+    # 不监控 /monitor、/monitor-data 和静态资源请求；HEAD/OPTIONS探测请求不计入心跳
+    if request.method in ('HEAD', 'OPTIONS') or request.path.startswith(UNTRACKED_PATH_PREFIXES):
         return
     
     # 获取客户端ID（从请求参数或header中）
@@ -309,78 +502,34 @@ def track_connection():
     if not client_id:
         return
     
+    # 快速路径：刚刷新过心跳的客户端（如播放中的连续Range请求）无需获取锁
+    info = active_connections.get(client_id)
+    if info is not None and time.time() - info.last_seen < TRACK_REFRESH_INTERVAL:
+        return
+    
     client_ip = request.remote_addr
     client_port = request.environ.get('REMOTE_PORT', 'N/A')
     server_ip = request.host.split(':')[0]
     
-    if client_id not in active_connections and len(active_connections) >= MAX_CONNECTIONS:
-        cleanup_oldest_connections(10)
-    
     with connection_lock:
         if client_id not in active_connections:
             if len(active_connections) >= MAX_CONNECTIONS:
-                cleanup_oldest_connections(10)
+                evict_oldest_connections(10)
             
             interface_name = get_interface_name(server_ip)
             
-            active_connections[client_id] = {
-                'client_id': client_id,
-                'client_ip': client_ip,
-                'server_ip': server_ip,
-                'client_port': client_port,
-                'interface': interface_name,
-                'last_seen': time.time(),
-                'video': '未播放',
-                'position': 0,
-                'duration': 0,
-                'bandwidth_down': 0,
-                'bandwidth_up': 0,
-                'connected_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
+            active_connections[client_id] = ConnectionInfo(
+                client_id, client_ip, client_port, server_ip, interface_name)
+            connections_changed.set()
         else:
             # 更新最后心跳时间和可能变化的端口
-            active_connections[client_id]['last_seen'] = time.time()
-            active_connections[client_id]['client_ip'] = client_ip
-            active_connections[client_id]['client_port'] = client_port
+            info = active_connections[client_id]
+            touch_connection(client_id, info)
+            info.client_ip = client_ip
+            info.client_port = client_port
 
-@app.route('/')
-def index():
-    """主页：视频列表和播放器界面"""
-    user_agent = request.headers.get('User-Agent', '').lower()
-    is_mobile = any(x in user_agent for x in ['mobile', 'android', 'iphone', 'ipad', 'ipod'])
-    
-    secret_token = request.args.get('secretnumber', '')
-    is_secret_mode = False
-    
-    if secret_token:
-        clean_expired_tokens()
-        if secret_token in valid_tokens:
-            token_info = valid_tokens[secret_token]
-            
-            if isinstance(token_info, (int, float)):
-                if token_info > 0:
-                    is_secret_mode = True
-                    valid_tokens[secret_token] = -1
-                else:
-                    return render_template_string('<script>alert("访问链接已失效，不能重复使用！"); window.location.href="/";</script>')
-            elif isinstance(token_info, dict):
-                used_time = token_info.get('used_time')
-                if used_time is None:
-                    is_secret_mode = True
-                    valid_tokens[secret_token]['used_time'] = time.time()
-                else:
-                    return render_template_string('<script>alert("访问链接已失效，不能重复使用！"); window.location.href="/";</script>')
-        else:
-            return render_template_string('<script>alert("访问链接已失效！"); window.location.href="/";</script>')
-    
-    return render_template_string('''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>视频分享中心</title>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0, maximum-scale=1.0, user-scalable=no">
-    <style>
+# 主页样式表，启动时预先压缩，由/assets/app.css提供并长期缓存
+INDEX_CSS = '''
         * { margin: 0; padding: 0; box-sizing: border-box; }
         
         body {
@@ -393,6 +542,8 @@ def index():
         
         body.mobile {
             flex-direction: column;
+            /* 禁用双击缩放，由浏览器直接处理，无需在touchend中拦截 */
+            touch-action: manipulation;
         }
         
         #sidebar {
@@ -1095,7 +1246,21 @@ def index():
                 display: none; /* 只显示图标 */
             }
         }
-    </style>
+'''
+
+index_css_bytes = INDEX_CSS.encode('utf-8')
+index_css_gzip = gzip.compress(index_css_bytes, 9)
+index_css_etag = hashlib.md5(index_css_bytes).hexdigest()[:16]
+
+# 主页模板，启动时编译一次，请求时只做渲染
+INDEX_TEMPLATE = '''
+<!DOCTYPE html>
+<html>
+<head>
+    <title>视频分享中心</title>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0, maximum-scale=1.0, user-scalable=no">
+    <link rel="stylesheet" href="/assets/app.css?v={{ css_version }}">
 </head>
 <body class="{{ 'mobile' if is_mobile else 'desktop' }}">
     <div id="main">
@@ -1108,7 +1273,7 @@ def index():
                         <span id="autoplayText">连续播放</span>
                     </button>
                     <button class="fullpage-btn" id="fullpageBtn" onclick="toggleFullpage()">
-                        <span class="fullpage-icon">⬜</span>
+                        <span class="fullpage-icon" id="fullpageIcon">⬜</span>
                         <span id="fullpageText">全页面</span>
                     </button>
                 </div>
@@ -1123,7 +1288,7 @@ def index():
                     </button>
                 </div>
             </div>
-            <video id="player" controls playsinline webkit-playsinline preload="metadata"></video>
+            <video id="player" controls playsinline webkit-playsinline preload="none"></video>
             <div class="video-title" id="videoTitle"></div>
         </div>
         <div class="empty-state" id="emptyState">
@@ -1158,6 +1323,7 @@ def index():
         </div>
     </div>
     
+<script type="application/json" id="videoData">{{ videos|tojson }}</script>
 <script>
 const videoListEl = document.getElementById('videoList');
 const player = document.getElementById('player');
@@ -1170,16 +1336,73 @@ const sidebar = document.getElementById('sidebar');
 const sidebarHeader = document.getElementById('sidebarHeader');
 const passwordModal = document.getElementById('passwordModal');
 const passwordInput = document.getElementById('passwordInput');
+const autoplayBtn = document.getElementById('autoplayBtn');
+const autoplayText = document.getElementById('autoplayText');
+const fullpageBtn = document.getElementById('fullpageBtn');
+const fullpageIcon = document.getElementById('fullpageIcon');
+const fullpageText = document.getElementById('fullpageText');
+const prevBtn = document.getElementById('prevBtn');
+const nextBtn = document.getElementById('nextBtn');
 const isMobile = document.body.classList.contains('mobile');
 const isSecretMode = {{ 'true' if is_secret_mode else 'false' }};
+// localStorage的key，秘密模式下使用另一套，互不影响
+const STORAGE = isSecretMode ? {
+    lastVideo: 'lastSecretVideo',
+    timePrefix: 'secretVideoTime_',
+    durationPrefix: 'secretVideoDuration_',
+    autoplay: 'autoplaySecretEnabled',
+    fullpage: 'fullpageSecretMode'
+} : {
+    lastVideo: 'lastVideo',
+    timePrefix: 'videoTime_',
+    durationPrefix: 'videoDuration_',
+    autoplay: 'autoplayEnabled',
+    fullpage: 'fullpageMode'
+};
 let currentVideo = null;
 let allVideos = [];
+let videoIndex = new Map(); // 视频路径 -> 在allVideos中的下标
+let allVideosLower = []; // 预先转换好的小写路径，搜索时不再逐个toLowerCase
+let videoItemEls = []; // 与allVideos下标对应的列表条目元素
+let itemVisible = new Uint8Array(0); // 各条目当前是否显示
+let folderBlocks = []; // 各文件夹的标题、容器、计数元素及所含视频下标
+let activeItemEl = null; // 当前高亮的条目
 let isAutoplayEnabled = false;
 let isFullpageMode = false;
 let clientId = null;
 let heartbeatInterval = 10000; // 默认10秒
 let heartbeatTimer = null;
 
+// 非关键的设置写入放到浏览器空闲时执行，不阻塞按键/点击的响应
+// 尚未写入的值记在pendingWrites中，同一个键只保留最新值，离开页面时同步补写
+const pendingWrites = new Map();
+
+function idleSetItem(key, value) {
+    const scheduled = pendingWrites.has(key);
+    pendingWrites.set(key, value);
+    if (scheduled) return;
+    
+    const write = () => {
+        if (pendingWrites.has(key)) {
+            localStorage.setItem(key, pendingWrites.get(key));
+            pendingWrites.delete(key);
+        }
+    };
+    if ('requestIdleCallback' in window) {
+        requestIdleCallback(write, { timeout: 1000 });
+    } else {
+        setTimeout(write, 0);
+    }
+}
+
+function flushPendingWrites() {
+    pendingWrites.forEach((value, key) => localStorage.setItem(key, value));
+    pendingWrites.clear();
+}
+
+window.addEventListener('beforeunload', flushPendingWrites);
+window.addEventListener('pagehide', flushPendingWrites);
+
 // 获取URL参数
 const urlParams = new URLSearchParams(window.location.search);
 const secretToken = urlParams.get('secretnumber') || '';
@@ -1192,8 +1415,9 @@ async function initializeClient() {
         clientId = data.client_id;
         heartbeatInterval = (data.heartbeat_interval || 10) * 1000;
         
-        // 启动心跳
+        // 启动心跳，并立即发送一次，让监控页马上看到该客户端
         startHeartbeat();
+        sendHeartbeat();
         
         console.log('客户端ID已获取:', clientId);
     } catch (error) {
@@ -1271,53 +1495,59 @@ if (isSecretMode) {
     });
 }
 
-// 加载视频列表（等待客户端ID就绪）
-async function loadVideoList() {
-    // 等待客户端ID
+// 加载视频列表：列表随页面一起下发，直接解析即可渲染，无需再请求/videos
+function loadVideoList() {
+    const list = JSON.parse(document.getElementById('videoData').textContent);
+    allVideos = list;
+    videoIndex = new Map(list.map((v, i) => [v, i]));
+    allVideosLower = list.map(v => v.toLowerCase());
+    renderVideoList(list);
+    videoCount.textContent = `共 ${list.length} 个视频`;
+    
+    // 恢复连续播放状态
+    const savedAutoplay = localStorage.getItem(STORAGE.autoplay);
+    if (savedAutoplay === 'true') {
+        isAutoplayEnabled = true;
+        updateAutoplayButton();
+    }
+    
+    resumeLastVideo();
+}
+
+// 自动加载上次播放的视频（视频请求需要带client_id，等待客户端ID就绪）
+async function resumeLastVideo() {
+    const lastVideo = localStorage.getItem(STORAGE.lastVideo);
+    if (!lastVideo || !videoIndex.has(lastVideo)) return;
+    
     while (!clientId) {
         await new Promise(resolve => setTimeout(resolve, 100));
     }
     
-    const videosUrl = secretToken ? 
-        buildUrl('/videos?secretnumber=' + secretToken) : 
-        buildUrl('/videos');
+    // 用户在等待期间已手动选择了视频则不再覆盖
+    if (currentVideo) return;
+    loadVideo(lastVideo);
     
-    fetch(videosUrl).then(r => r.json()).then(list => {
-        allVideos = list;
-        renderVideoList(list);
-        videoCount.textContent = `共 ${list.length} 个视频`;
-        
-        // 自动加载上次播放的视频（秘密模式下使用不同的key）
-        const storageKey = isSecretMode ? 'lastSecretVideo' : 'lastVideo';
-        const lastVideo = localStorage.getItem(storageKey);
-        if (lastVideo && list.includes(lastVideo)) loadVideo(lastVideo);
-        
-        // 恢复连续播放状态
-        const autoplayKey = isSecretMode ? 'autoplaySecretEnabled' : 'autoplayEnabled';
-        const savedAutoplay = localStorage.getItem(autoplayKey);
-        if (savedAutoplay === 'true') {
-            isAutoplayEnabled = true;
-            updateAutoplayButton();
-        }
-        
-        // 恢复全页面播放状态
-        if (lastVideo && list.includes(lastVideo)) {
-            restoreFullpageMode();
-        }
-    });
+    // 恢复全页面播放状态
+    restoreFullpageMode();
 }
 
 // 启动视频列表加载
 loadVideoList();
 
 function renderVideoList(list) {
-    videoListEl.innerHTML = '';
-    
-    // 组织文件到文件夹结构
+    // 列表只在页面加载时构建一次，搜索时只切换条目的显示状态
+    // 先在DocumentFragment中构建全部节点，最后一次性挂到列表上
+    const frag = document.createDocumentFragment();
+    videoItemEls = new Array(list.length);
+    itemVisible = new Uint8Array(list.length).fill(1);
+    folderBlocks = [];
+    activeItemEl = null;
+    
+    // 组织文件到文件夹结构（记录视频在列表中的下标）
     const folderMap = {};
     const rootVideos = [];
     
-    list.forEach(v => {
+    list.forEach((v, i) => {
         const parts = v.split('/');
         if (parts.length > 1) {
             // 有文件夹
@@ -1325,62 +1555,120 @@ function renderVideoList(list) {
             if (!folderMap[folderName]) {
                 folderMap[folderName] = [];
             }
-            folderMap[folderName].push(v);
+            folderMap[folderName].push(i);
         } else {
             // 根目录视频
-            rootVideos.push(v);
+            rootVideos.push(i);
         }
     });
     
     // 渲染根目录视频
-    rootVideos.forEach(v => {
-        const div = document.createElement('div');
-        div.className = 'video-item';
-        div.innerHTML = `<span class="video-name" title="${v}">${v}</span>`;
-        div.onclick = () => loadVideo(v);
-        if (v === currentVideo) div.classList.add('active');
-        videoListEl.appendChild(div);
+    rootVideos.forEach(i => {
+        frag.appendChild(createVideoItem(list, i, list[i]));
     });
     
     // 渲染文件夹
     Object.keys(folderMap).sort().forEach(folderName => {
-        const videos = folderMap[folderName];
+        const indices = folderMap[folderName];
         
         // 创建文件夹项
         const folderDiv = document.createElement('div');
         folderDiv.className = 'folder-item';
-        folderDiv.innerHTML = `
-            <span class="folder-icon">▼</span>
-            <span class="folder-name" title="${folderName}">📁 ${folderName}</span>
-            <span class="folder-count">(${videos.length})</span>
-        `;
+        const countEl = createSpan('folder-count', `(${indices.length})`);
+        folderDiv.append(
+            createSpan('folder-icon', '▼'),
+            createSpan('folder-name', '📁 ' + folderName, folderName),
+            countEl
+        );
         
         // 创建视频容器
         const videosDiv = document.createElement('div');
         videosDiv.className = 'folder-videos expanded';
         
-        videos.forEach(v => {
-            const videoDiv = document.createElement('div');
-            videoDiv.className = 'video-item';
-            const fileName = v.split('/').pop();
-            videoDiv.innerHTML = `<span class="video-name" title="${v}">${fileName}</span>`;
-            videoDiv.onclick = () => loadVideo(v);
-            if (v === currentVideo) videoDiv.classList.add('active');
-            videosDiv.appendChild(videoDiv);
+        indices.forEach(i => {
+            const fileName = list[i].split('/').pop();
+            videosDiv.appendChild(createVideoItem(list, i, fileName));
         });
         
-        // 文件夹点击事件
-        folderDiv.onclick = () => {
-            folderDiv.classList.toggle('collapsed');
-            videosDiv.classList.toggle('expanded');
-        };
+        folderBlocks.push({
+            folderDiv,
+            videosDiv,
+            countEl,
+            indices,
+            visibleCount: indices.length
+        });
         
-        videoListEl.appendChild(folderDiv);
-        videoListEl.appendChild(videosDiv);
+        frag.appendChild(folderDiv);
+        frag.appendChild(videosDiv);
     });
+    
+    videoListEl.textContent = '';
+    videoListEl.appendChild(frag);
 }
 
+// 创建带class的span，文本用textContent写入，文件名中的特殊字符不会被当作HTML解析
+function createSpan(className, text, title) {
+    const span = document.createElement('span');
+    span.className = className;
+    span.textContent = text;
+    if (title) span.title = title;
+    return span;
+}
+
+// 创建list[i]对应的视频条目并登记到videoItemEls
+function createVideoItem(list, i, label) {
+    const v = list[i];
+    const div = document.createElement('div');
+    div.className = 'video-item';
+    div.dataset.video = v;
+    div.appendChild(createSpan('video-name', label, v));
+    if (v === currentVideo) {
+        div.classList.add('active');
+        activeItemEl = div;
+    }
+    videoItemEls[i] = div;
+    return div;
+}
+
+// 按搜索结果切换条目显示：只改动显示状态发生变化的条目，隐藏没有匹配项的文件夹
+function applyVideoFilter(matches) {
+    const visible = new Uint8Array(allVideos.length);
+    for (const i of matches) visible[i] = 1;
+    
+    for (let i = 0; i < visible.length; i++) {
+        if (visible[i] !== itemVisible[i]) {
+            videoItemEls[i].style.display = visible[i] ? '' : 'none';
+        }
+    }
+    itemVisible = visible;
+    
+    folderBlocks.forEach(block => {
+        let count = 0;
+        for (const i of block.indices) count += visible[i];
+        if (count === block.visibleCount) return;
+        block.visibleCount = count;
+        block.countEl.textContent = `(${count})`;
+        const display = count ? '' : 'none';
+        block.folderDiv.style.display = display;
+        block.videosDiv.style.display = display;
+    });
+}
+
+// 列表点击统一由videoListEl处理，不再给每个条目单独绑定onclick
+videoListEl.addEventListener('click', function(e) {
+    const folderItem = e.target.closest('.folder-item');
+    if (folderItem) {
+        folderItem.classList.toggle('collapsed');
+        folderItem.nextElementSibling.classList.toggle('expanded');
+        return;
+    }
+    const videoItem = e.target.closest('.video-item');
+    if (videoItem) loadVideo(videoItem.dataset.video);
+});
+
 function loadVideo(v, startFromBeginning = false) {
+    // 先保存上一个视频尚未写入的进度
+    saveProgress();
     currentVideo = v;
     
     // 构建视频URL，添加client_id
@@ -1391,14 +1679,14 @@ function loadVideo(v, startFromBeginning = false) {
         videoUrl = buildUrl('/video/' + encodeURIComponent(v));
     }
     
+    // 播放器初始为preload="none"，选中视频后才允许预读元数据
+    player.preload = 'metadata';
     player.src = videoUrl;
     videoTitle.textContent = v;
     
-    // 使用不同的storage key
-    const storageKey = isSecretMode ? 'lastSecretVideo' : 'lastVideo';
-    const timeKey = isSecretMode ? 'secretVideoTime_' + v : 'videoTime_' + v;
+    const timeKey = STORAGE.timePrefix + v;
     
-    localStorage.setItem(storageKey, v);
+    localStorage.setItem(STORAGE.lastVideo, v);
     
     // 如果需要从头开始播放，则设置为0，否则恢复上次播放位置
     if (startFromBeginning) {
@@ -1411,23 +1699,21 @@ function loadVideo(v, startFromBeginning = false) {
     playerContainer.style.display = 'block';
     emptyState.style.display = 'none';
     
-    // 更新选中状态
-    document.querySelectorAll('.video-item').forEach(item => {
-        item.classList.remove('active');
-        const videoNameEl = item.querySelector('.video-name');
-        if (videoNameEl && videoNameEl.getAttribute('title') === v) {
-            item.classList.add('active');
-            // 如果视频在文件夹中，确保文件夹是展开的
-            const parentFolder = item.parentElement;
-            if (parentFolder && parentFolder.classList.contains('folder-videos')) {
-                parentFolder.classList.add('expanded');
-                const folderItem = parentFolder.previousElementSibling;
-                if (folderItem && folderItem.classList.contains('folder-item')) {
-                    folderItem.classList.remove('collapsed');
-                }
+    // 更新选中状态：只需改动旧的和新的两个条目
+    if (activeItemEl) activeItemEl.classList.remove('active');
+    activeItemEl = videoItemEls[getCurrentVideoIndex()] || null;
+    if (activeItemEl) {
+        activeItemEl.classList.add('active');
+        // 如果视频在文件夹中，确保文件夹是展开的
+        const parentFolder = activeItemEl.parentElement;
+        if (parentFolder && parentFolder.classList.contains('folder-videos')) {
+            parentFolder.classList.add('expanded');
+            const folderItem = parentFolder.previousElementSibling;
+            if (folderItem && folderItem.classList.contains('folder-item')) {
+                folderItem.classList.remove('collapsed');
             }
         }
-    });
+    }
     
     // 移动端不再自动收起侧边栏
     // if (isMobile) {
@@ -1447,39 +1733,77 @@ function loadVideo(v, startFromBeginning = false) {
 }
 
 // 上报播放状态到服务器
+const JSON_HEADERS = { 'Content-Type': 'application/json' };
+let lastReport = { clientId: null, video: null, position: -1 };
+
 function reportPlayStatus() {
     if (currentVideo && player.duration && clientId) {
-        const url = buildUrl('/update-status');
-        fetch(url, {
+        const position = player.currentTime;
+        // 与上次上报的客户端、视频和位置都相同时（如暂停中）无需重复上报
+        if (lastReport.clientId === clientId && lastReport.video === currentVideo && lastReport.position === position) {
+            return;
+        }
+        lastReport = { clientId, video: currentVideo, position };
+        
+        fetch(buildUrl('/update-status'), {
             method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
+            headers: JSON_HEADERS,
             body: JSON.stringify({
                 video: currentVideo,
-                position: player.currentTime,
+                position: position,
                 duration: player.duration
             })
         }).catch(() => {});  // 忽略错误
     }
 }
 
-// 定期上报播放状态（每5秒）
-setInterval(reportPlayStatus, 5000);
+// 定期上报播放状态：播放中每5秒一次，页面在后台时放慢到20秒，暂停或未加载视频时不上报
+const REPORT_INTERVAL = 5000;
+const HIDDEN_REPORT_INTERVAL = 20000;
 
-// 记录播放进度和总时长
-player.ontimeupdate = function() {
-    if (currentVideo) {
-        const timeKey = isSecretMode ? 'secretVideoTime_' + currentVideo : 'videoTime_' + currentVideo;
-        localStorage.setItem(timeKey, player.currentTime);
+function scheduleReport() {
+    setTimeout(() => {
+        if (currentVideo && !player.paused) reportPlayStatus();
+        scheduleReport();
+    }, document.hidden ? HIDDEN_REPORT_INTERVAL : REPORT_INTERVAL);
+}
+
+scheduleReport();
+
+// 记录播放进度：localStorage为同步写入，播放中每2秒最多写一次，暂停/切换/离开页面时立即写入
+const PROGRESS_SAVE_INTERVAL = 2000;
+let lastProgressSave = 0;
+
+function saveProgress() {
+    // 切换视频源后readyState归零，此时的currentTime不是有效进度
+    if (currentVideo && player.readyState > 0) {
+        localStorage.setItem(STORAGE.timePrefix + currentVideo, player.currentTime);
     }
+}
+
+player.ontimeupdate = function() {
+    const now = performance.now();
+    if (now - lastProgressSave < PROGRESS_SAVE_INTERVAL) return;
+    lastProgressSave = now;
+    saveProgress();
+};
+
+// 暂停时保存进度并上报一次最终位置（暂停期间不再定期上报）
+player.onpause = function() {
+    saveProgress();
+    reportPlayStatus();
 };
+// 移动端浏览器关闭或切到后台时常常不触发beforeunload，pagehide和页面隐藏时也要写入
+window.addEventListener('beforeunload', saveProgress);
+window.addEventListener('pagehide', saveProgress);
+document.addEventListener('visibilitychange', function() {
+    if (document.hidden) saveProgress();
+});
 
 // 记录视频总时长
 player.onloadedmetadata = function() {
     if (currentVideo && player.duration) {
-        const durationKey = isSecretMode ? 'secretVideoDuration_' + currentVideo : 'videoDuration_' + currentVideo;
-        localStorage.setItem(durationKey, player.duration);
+        localStorage.setItem(STORAGE.durationPrefix + currentVideo, player.duration);
         // 立即上报一次状态
         reportPlayStatus();
     }
@@ -1495,7 +1819,7 @@ player.onloadedmetadata = function() {
 player.onended = function() {
     if (isAutoplayEnabled && allVideos.length > 0) {
         // 找到当前视频的索引
-        const currentIndex = allVideos.indexOf(currentVideo);
+        const currentIndex = getCurrentVideoIndex();
         if (currentIndex !== -1 && currentIndex < allVideos.length - 1) {
             // 播放下一个视频，总是从头开始
             loadVideo(allVideos[currentIndex + 1], true);
@@ -1506,27 +1830,29 @@ player.onended = function() {
     }
 };
 
+// 当前视频在列表中的下标，不在列表中时返回-1
+function getCurrentVideoIndex() {
+    const index = videoIndex.get(currentVideo);
+    return index === undefined ? -1 : index;
+}
+
 // 切换连续播放状态
 function toggleAutoplay() {
     isAutoplayEnabled = !isAutoplayEnabled;
     updateAutoplayButton();
     
     // 保存状态到localStorage
-    const autoplayKey = isSecretMode ? 'autoplaySecretEnabled' : 'autoplayEnabled';
-    localStorage.setItem(autoplayKey, isAutoplayEnabled.toString());
+    idleSetItem(STORAGE.autoplay, isAutoplayEnabled.toString());
 }
 
 // 更新连续播放按钮状态
 function updateAutoplayButton() {
-    const btn = document.getElementById('autoplayBtn');
-    const text = document.getElementById('autoplayText');
-    
     if (isAutoplayEnabled) {
-        btn.classList.add('active');
-        text.textContent = '连续播放：开';
+        autoplayBtn.classList.add('active');
+        autoplayText.textContent = '连续播放：开';
     } else {
-        btn.classList.remove('active');
-        text.textContent = '连续播放：关';
+        autoplayBtn.classList.remove('active');
+        autoplayText.textContent = '连续播放：关';
     }
 }
 
@@ -1534,7 +1860,7 @@ function updateAutoplayButton() {
 function playPrevious() {
     if (!currentVideo || allVideos.length === 0) return;
     
-    const currentIndex = allVideos.indexOf(currentVideo);
+    const currentIndex = getCurrentVideoIndex();
     if (currentIndex > 0) {
         // 从头开始播放上一集
         loadVideo(allVideos[currentIndex - 1], true);
@@ -1548,7 +1874,7 @@ function playPrevious() {
 function playNext() {
     if (!currentVideo || allVideos.length === 0) return;
     
-    const currentIndex = allVideos.indexOf(currentVideo);
+    const currentIndex = getCurrentVideoIndex();
     if (currentIndex !== -1 && currentIndex < allVideos.length - 1) {
         // 从头开始播放下一集
         loadVideo(allVideos[currentIndex + 1], true);
@@ -1560,9 +1886,6 @@ function playNext() {
 
 // 更新上一集/下一集按钮状态
 function updateEpisodeButtons() {
-    const prevBtn = document.getElementById('prevBtn');
-    const nextBtn = document.getElementById('nextBtn');
-    
     if (!currentVideo || allVideos.length === 0) {
         prevBtn.disabled = true;
         nextBtn.disabled = true;
@@ -1574,9 +1897,15 @@ function updateEpisodeButtons() {
     nextBtn.disabled = false;
 }
 
-// 搜索功能
+// 搜索功能：输入停顿120毫秒后再筛选，连续输入时只做最后一次
+const SEARCH_DELAY = 120;
+let searchTimer = null;
+let lastSearchKeyword = '';
+let lastSearchMatches = null; // 上次匹配结果在allVideos中的下标
+
 searchInput.addEventListener('input', function() {
     const keyword = this.value.toLowerCase();
+    clearTimeout(searchTimer);
     
     // 检测是否输入了触发词
     if (keyword === '{{ search_trigger }}' && !isSecretMode) {
@@ -1589,11 +1918,39 @@ searchInput.addEventListener('input', function() {
         return;
     }
     
-    const filtered = allVideos.filter(v => v.toLowerCase().includes(keyword));
-    renderVideoList(filtered);
-    videoCount.textContent = `${filtered.length} / ${allVideos.length} 个视频`;
+    searchTimer = setTimeout(() => filterVideos(keyword), SEARCH_DELAY);
 });
 
+function filterVideos(keyword) {
+    // 新关键词是上次关键词的延伸时，只需在上次的结果中继续筛选
+    const matches = [];
+    if (lastSearchMatches && keyword.startsWith(lastSearchKeyword)) {
+        for (const i of lastSearchMatches) {
+            if (allVideosLower[i].includes(keyword)) matches.push(i);
+        }
+    } else {
+        for (let i = 0; i < allVideosLower.length; i++) {
+            if (allVideosLower[i].includes(keyword)) matches.push(i);
+        }
+    }
+    // 结果与上次相同（如继续输入但匹配项没有减少）时无需再遍历列表条目
+    const unchanged = sameMatches(matches, lastSearchMatches);
+    lastSearchKeyword = keyword;
+    lastSearchMatches = matches;
+    
+    if (!unchanged) applyVideoFilter(matches);
+    videoCount.textContent = `${matches.length} / ${allVideos.length} 个视频`;
+}
+
+// 两次匹配结果都是递增的下标数组，逐项比较即可
+function sameMatches(a, b) {
+    if (!b || a.length !== b.length) return false;
+    for (let i = 0; i < a.length; i++) {
+        if (a[i] !== b[i]) return false;
+    }
+    return true;
+}
+
 // 密码验证
 function verifyPassword() {
     const password = passwordInput.value;
@@ -1635,59 +1992,34 @@ passwordInput.addEventListener('keypress', function(e) {
 });
 
 // 键盘快捷键（仅桌面端）
+// 按键 -> 处理函数；repeat表示长按时允许连续触发，run返回false表示未处理（不阻止默认行为）
+const keyHandlers = {
+    // 空格切换播放/暂停
+    ' ': { run: () => { if (player.paused) player.play(); else player.pause(); } },
+    // F键切换全页面播放
+    'f': { run: () => { if (currentVideo) toggleFullpage(); } },
+    // Esc键退出全页面播放
+    'Escape': { run: () => { if (!isFullpageMode) return false; toggleFullpage(); } },
+    // 左方向键后退5秒（支持长按连续跳转）
+    'ArrowLeft': { repeat: true, run: () => { player.currentTime = Math.max(0, player.currentTime - 5); } },
+    // 右方向键前进5秒（支持长按连续跳转）
+    'ArrowRight': { repeat: true, run: () => { player.currentTime = Math.min(player.duration, player.currentTime + 5); } },
+    // Ctrl+左方向键播放上一集
+    'Ctrl+ArrowLeft': { run: playPrevious },
+    // Ctrl+右方向键播放下一集
+    'Ctrl+ArrowRight': { run: playNext }
+};
+keyHandlers['F'] = keyHandlers['f'];
+
 if (!isMobile) {
     document.addEventListener('keydown', function(e) {
         if (e.target.tagName === 'INPUT') return;
         
-        if (e.key === ' ') {
-            // 防止键盘重复触发（长按时）
-            if (e.repeat) return;
-            e.preventDefault();
-            if (player.paused) player.play();
-            else player.pause();
-        }
-        
-        // F键切换全页面播放
-        if (e.key === 'f' || e.key === 'F') {
-            if (e.repeat) return;
-            e.preventDefault();
-            if (currentVideo) {
-                toggleFullpage();
-            }
-        }
-        
-        // Esc键退出全页面播放
-        if (e.key === 'Escape' && isFullpageMode) {
-            if (e.repeat) return;
-            e.preventDefault();
-            toggleFullpage();
-        }
-        
-        // 左方向键后退5秒（支持长按连续跳转）
-        if (e.key === 'ArrowLeft' && !e.ctrlKey) {
-            e.preventDefault();
-            player.currentTime = Math.max(0, player.currentTime - 5);
-        }
-        
-        // 右方向键前进5秒（支持长按连续跳转）
-        if (e.key === 'ArrowRight' && !e.ctrlKey) {
-            e.preventDefault();
-            player.currentTime = Math.min(player.duration, player.currentTime + 5);
-        }
-        
-        // Ctrl+左方向键播放上一集
-        if (e.key === 'ArrowLeft' && e.ctrlKey) {
-            if (e.repeat) return;
-            e.preventDefault();
-            playPrevious();
-        }
-        
-        // Ctrl+右方向键播放下一集
-        if (e.key === 'ArrowRight' && e.ctrlKey) {
-            if (e.repeat) return;
-            e.preventDefault();
-            playNext();
-        }
+        const handler = (e.ctrlKey && keyHandlers['Ctrl+' + e.key]) || keyHandlers[e.key];
+        // 防止键盘重复触发（长按时）
+        if (!handler || (e.repeat && !handler.repeat)) return;
+        if (handler.run() === false) return;
+        e.preventDefault();
     });
 }
 
@@ -1695,8 +2027,8 @@ if (!isMobile) {
 function scrollCurrentVideoToCenter() {
     if (!currentVideo) return;
     
-    // 找到当前激活的视频项
-    const activeItem = document.querySelector('.video-item.active');
+    // 当前激活的视频项
+    const activeItem = activeItemEl;
     if (!activeItem) return;
     
     // 获取滚动容器
@@ -1769,26 +2101,21 @@ function toggleFullpage() {
     updateFullpageButton();
     
     // 保存状态
-    const storageKey = isSecretMode ? 'fullpageSecretMode' : 'fullpageMode';
-    localStorage.setItem(storageKey, isFullpageMode.toString());
+    idleSetItem(STORAGE.fullpage, isFullpageMode.toString());
 }
 
 // 更新全页面播放按钮状态
 function updateFullpageButton() {
-    const btn = document.getElementById('fullpageBtn');
-    const icon = document.querySelector('.fullpage-icon');
-    const text = document.getElementById('fullpageText');
-    
     if (isFullpageMode) {
         document.body.classList.add('fullpage-mode');
-        btn.classList.add('active');
-        icon.textContent = '◱';
-        text.textContent = '全页面：开';
+        fullpageBtn.classList.add('active');
+        fullpageIcon.textContent = '◱';
+        fullpageText.textContent = '全页面：开';
     } else {
         document.body.classList.remove('fullpage-mode');
-        btn.classList.remove('active');
-        icon.textContent = '⬜';
-        text.textContent = '全页面：关';
+        fullpageBtn.classList.remove('active');
+        fullpageIcon.textContent = '⬜';
+        fullpageText.textContent = '全页面：关';
     }
 }
 
@@ -1801,51 +2128,76 @@ function restoreFullpageMode() {
         return;
     }
     
-    const storageKey = isSecretMode ? 'fullpageSecretMode' : 'fullpageMode';
-    const savedFullpage = localStorage.getItem(storageKey);
+    const savedFullpage = localStorage.getItem(STORAGE.fullpage);
     if (savedFullpage === 'true' && currentVideo) {
         isFullpageMode = true;
         updateFullpageButton();
     }
 }
 
-// 阻止移动端双击缩放
-if (isMobile) {
-    let lastTouchEnd = 0;
-    document.addEventListener('touchend', function(e) {
-        const now = Date.now();
-        if (now - lastTouchEnd <= 300) {
-            e.preventDefault();
-        }
-        lastTouchEnd = now;
-    }, false);
-    
-    // 监听屏幕方向变化
-    function handleOrientationChange() {
-        // 横屏时确保侧边栏隐藏（CSS已处理，这里只是确保状态一致）
-        // 竖屏时恢复侧边栏
-        const isLandscape = window.matchMedia('(orientation: landscape)').matches;
-        
-        if (isLandscape) {
-            // 横屏：侧边栏被CSS隐藏
-            console.log('横屏模式：视频库已隐藏');
-        } else {
-            // 竖屏：侧边栏显示
-            console.log('竖屏模式：视频库已显示');
-        }
-    }
-    
-    // 初始检查
-    handleOrientationChange();
-    
-    // 监听方向变化
-    window.addEventListener('orientationchange', handleOrientationChange);
-    window.addEventListener('resize', handleOrientationChange);
-}
 </script>
 </body>
 </html>
-''', is_mobile=is_mobile, is_secret_mode=is_secret_mode, search_trigger=SEARCH_TRIGGER)
+'''
+
+index_template = app.jinja_env.from_string(INDEX_TEMPLATE)
+
+MOBILE_UA_KEYWORDS = ('mobile', 'android', 'iphone', 'ipad', 'ipod')
+
+@functools.lru_cache(maxsize=256)
+def is_mobile_user_agent(user_agent):
+    """根据User-Agent判断是否为移动端，同一UA只判断一次"""
+    user_agent = user_agent.lower()
+    return any(x in user_agent for x in MOBILE_UA_KEYWORDS)
+
+@app.route('/')
+def index():
+    """主页：视频列表和播放器界面"""
+    is_mobile = is_mobile_user_agent(request.headers.get('User-Agent', ''))
+    
+    secret_token = request.args.get('secretnumber', '')
+    is_secret_mode = False
+    
+    if secret_token:
+        clean_expired_tokens()
+        if secret_token in valid_tokens:
+            token_info = valid_tokens[secret_token]
+            
+            if isinstance(token_info, (int, float)):
+                if token_info > 0:
+                    is_secret_mode = True
+                    valid_tokens[secret_token] = -1
+                else:
+                    return render_template_string('<script>alert("访问链接已失效，不能重复使用！"); window.location.href="/";</script>')
+            elif isinstance(token_info, dict):
+                used_time = token_info.get('used_time')
+                if used_time is None:
+                    is_secret_mode = True
+                    valid_tokens[secret_token]['used_time'] = time.time()
+                    schedule_token_cleanup(secret_token)
+                else:
+                    return render_template_string('<script>alert("访问链接已失效，不能重复使用！"); window.location.href="/";</script>')
+        else:
+            return render_template_string('<script>alert("访问链接已失效！"); window.location.href="/";</script>')
+    
+    # 视频列表直接嵌入页面，省去页面加载后再请求/videos的一次往返
+    return index_template.render(is_mobile=is_mobile, is_secret_mode=is_secret_mode, search_trigger=SEARCH_TRIGGER,
+                                 css_version=index_css_etag, videos=get_video_list(is_secret=is_secret_mode))
+
+@app.route('/assets/app.css')
+def index_css():
+    """主页样式表：返回预压缩内容，URL带版本号，可长期缓存"""
+    if 'gzip' in request.headers.get('Accept-Encoding', ''):
+        response = app.response_class(index_css_gzip, mimetype='text/css')
+        response.headers['Content-Encoding'] = 'gzip'
+        response.set_etag(index_css_etag + '-gzip')
+    else:
+        response = app.response_class(index_css_bytes, mimetype='text/css')
+        response.set_etag(index_css_etag)
+    
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response.make_conditional(request)
 
 # 健康检查端点（用于识别程序）
 @app.route('/health-check')
@@ -1877,7 +2229,7 @@ def heartbeat():
     
     with connection_lock:
         if client_id in active_connections:
-            active_connections[client_id]['last_seen'] = time.time()
+            touch_connection(client_id, active_connections[client_id])
             return jsonify({'success': True})
         else:
             # 客户端不存在，可能已超时被清理，返回需要重新注册
@@ -1895,6 +2247,7 @@ def verify_secret():
             'expire_time': time.time() + 300,
             'used_time': None
         }
+        schedule_token_cleanup(token)
         return jsonify({'success': True, 'token': token})
     else:
         return jsonify({'success': False})
@@ -1907,6 +2260,14 @@ def invalidate_token():
         del valid_tokens[secret_token]
     return '', 204
 
+def finite_number(value):
+    """把客户端上报的数值转换为有限的float，无法转换或为inf/nan时返回0"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError, OverflowError):
+        return 0
+    return number if math.isfinite(number) else 0
+
 @app.route('/update-status', methods=['POST'])
 def update_status():
     """接收并更新客户端播放状态"""
@@ -1916,29 +2277,20 @@ def update_status():
     if not client_id:
         return jsonify({'success': False, 'error': 'No client_id'}), 400
     
-    with connection_lock:
-        if client_id in active_connections:
-            active_connections[client_id].update({
-                'video': data.get('video', '未播放'),
-                'position': data.get('position', 0),
-                'duration': data.get('duration', 0),
-                'last_seen': time.time()
-            })
-            return jsonify({'success': True})
-        else:
-            return jsonify({'success': False, 'error': 'Client not found'}), 404
-
-@app.route('/monitor')
-def monitor():
-    """监控页面：显示服务器运行状态和连接信息"""
-    if MONITOR_USERNAME and MONITOR_PASSWORD:
-        auth = request.authorization
-        if not auth or auth.username != MONITOR_USERNAME or auth.password != MONITOR_PASSWORD:
-            return ('认证失败', 401, {
-                'WWW-Authenticate': 'Basic realm="Monitor Login Required"'
-            })
+    # 心跳时间已由track_connection刷新，这里只改写该客户端自己的播放字段，无需获取全局锁；
+    # 监控页快照最多看到一次新旧混合的播放状态，下一次上报即恢复一致
+    info = active_connections.get(client_id)
+    if info is None:
+        return jsonify({'success': False, 'error': 'Client not found'}), 404
     
-    return render_template_string('''
+    # 客户端上报的值原样进入监控数据，先规整类型，避免超出orjson范围的整数等让/monitor-data出错
+    info.video = str(data.get('video', '未播放'))
+    info.position = finite_number(data.get('position', 0))
+    info.duration = finite_number(data.get('duration', 0))
+    return jsonify({'success': True})
+
+# 监控页面只依赖端口号，启动时渲染一次并预先压缩
+MONITOR_TEMPLATE = '''
 <!DOCTYPE html>
 <html>
 <head>
@@ -2297,11 +2649,11 @@ def monitor():
         </div>
         
         <!-- 访问地址弹窗 -->
-        <div id="urlModal" class="modal" onclick="closeModal(event)">
-            <div class="modal-content" onclick="event.stopPropagation()">
+        <div id="urlModal" class="modal">
+            <div class="modal-content">
                 <div class="modal-header">
                     <h2>🌐 可访问地址</h2>
-                    <button class="modal-close" onclick="closeModal()">&times;</button>
+                    <button class="modal-close">&times;</button>
                 </div>
                 <div id="urlList">
                     <div style="text-align: center; padding: 20px; color: #999;">
@@ -2311,6 +2663,17 @@ def monitor():
             </div>
         </div>
         
+        <!-- 访问地址的一行，渲染时克隆后填入文字 -->
+        <template id="urlRowTemplate">
+            <div class="url-item">
+                <div class="url-interface"></div>
+                <div class="url-link">
+                    <span></span>
+                    <button class="copy-btn">复制</button>
+                </div>
+            </div>
+        </template>
+        
         <div class="stats">
             <div class="stat-card">
                 <div class="stat-value" id="activeConnections">0</div>
@@ -2337,25 +2700,26 @@ def monitor():
         </div>
         
         <div class="refresh-info">
-            ⟳ 每3秒自动刷新
+            ⟳ 每3秒自动刷新，数据无变化时逐步放慢至15秒
         </div>
     </div>
     
     <script>
         let cachedAccessUrls = [];
         
+        // 数值都是非负且远小于2^31，用|0取整代替Math.floor
         function formatTime(seconds) {
-            const mins = Math.floor(seconds / 60);
-            const secs = Math.floor(seconds % 60);
+            const mins = (seconds / 60) | 0;
+            const secs = (seconds % 60) | 0;
             return mins + ':' + (secs < 10 ? '0' : '') + secs;
         }
         
-        function formatDuration(seconds) {
-            const now = Date.now();
-            const duration = Math.floor((now - seconds * 1000) / 1000);
-            if (duration < 60) return duration + '秒前';
-            if (duration < 3600) return Math.floor(duration / 60) + '分钟前';
-            return Math.floor(duration / 3600) + '小时前';
+        // now由调用方每次刷新取一次，所有行共用
+        function formatDuration(seconds, now) {
+            const duration = ((now - seconds * 1000) / 1000) | 0;
+            return duration < 60 ? duration + '秒前'
+                : duration < 3600 ? ((duration / 60) | 0) + '分钟前'
+                : ((duration / 3600) | 0) + '小时前';
         }
         
         function showAccessUrls() {
@@ -2367,14 +2731,53 @@ def monitor():
             }
         }
         
-        function closeModal(event) {
-            if (!event || event.target.id === 'urlModal') {
-                document.getElementById('urlModal').classList.remove('show');
+        function closeModal() {
+            document.getElementById('urlModal').classList.remove('show');
+        }
+        
+        // 弹窗内的点击统一在这里处理：点击遮罩或关闭按钮关闭弹窗，点击复制按钮复制其data-url
+        document.getElementById('urlModal').addEventListener('click', function(event) {
+            if (event.target === this || event.target.closest('.modal-close')) {
+                closeModal();
+                return;
+            }
+            const copyBtn = event.target.closest('.copy-btn');
+            if (copyBtn) {
+                copyToClipboard(copyBtn.dataset.url, copyBtn);
+            }
+        });
+        
+        // 通过copy事件直接写入剪贴板数据，无需插入临时文本框再选中；返回是否成功
+        function copyWithCopyEvent(text) {
+            let copied = false;
+            const handler = e => {
+                e.clipboardData.setData('text/plain', text);
+                e.preventDefault();
+                copied = true;
+            };
+            document.addEventListener('copy', handler);
+            try {
+                document.execCommand('copy');
+            } catch (err) {
+                copied = false;
+            } finally {
+                document.removeEventListener('copy', handler);
             }
+            return copied;
         }
         
         function copyToClipboard(text, button) {
-            navigator.clipboard.writeText(text).then(() => {
+            // 通过局域网IP以http访问时不是安全上下文，navigator.clipboard不存在，直接使用copy事件
+            let copying;
+            if (navigator.clipboard) {
+                copying = navigator.clipboard.writeText(text).catch(err => {
+                    if (!copyWithCopyEvent(text)) throw err;
+                });
+            } else {
+                copying = copyWithCopyEvent(text) ? Promise.resolve() : Promise.reject();
+            }
+            
+            copying.then(() => {
                 const originalText = button.textContent;
                 button.textContent = '✓ 已复制';
                 button.classList.add('copied');
@@ -2387,6 +2790,32 @@ def monitor():
             });
         }
         
+        const urlRowTemplate = document.getElementById('urlRowTemplate');
+        
+        // 一个地址分组：克隆模板生成各行，文字用textContent写入
+        function createUrlSection(title, items, showInterface) {
+            const section = document.createElement('div');
+            section.className = 'url-section';
+            const titleEl = document.createElement('div');
+            titleEl.className = 'url-section-title';
+            titleEl.textContent = title;
+            section.appendChild(titleEl);
+            
+            items.forEach(item => {
+                const row = urlRowTemplate.content.cloneNode(true);
+                const interfaceEl = row.querySelector('.url-interface');
+                if (showInterface) {
+                    interfaceEl.textContent = item.interface;
+                } else {
+                    interfaceEl.remove();
+                }
+                row.querySelector('.url-link span').textContent = item.url;
+                row.querySelector('.copy-btn').dataset.url = item.url;
+                section.appendChild(row);
+            });
+            return section;
+        }
+        
         function renderAccessUrls(urls) {
             const urlList = document.getElementById('urlList');
             
@@ -2394,125 +2823,213 @@ def monitor():
             const localUrls = urls.filter(u => u.interface === '本地回环地址');
             const networkUrls = urls.filter(u => u.interface !== '本地回环地址');
             
-            let html = '';
+            const fragment = document.createDocumentFragment();
             
             if (localUrls.length > 0) {
-                html += '<div class="url-section">';
-                html += '<div class="url-section-title">🏠 本地访问 - 仅限本机</div>';
-                localUrls.forEach(item => {
-                    html += `
-                        <div class="url-item">
-                            <div class="url-link">
-                                <span>${item.url}</span>
-                                <button class="copy-btn" onclick="copyToClipboard('${item.url}', this)">复制</button>
-                            </div>
-                        </div>
-                    `;
-                });
-                html += '</div>';
+                fragment.appendChild(createUrlSection('🏠 本地访问 - 仅限本机', localUrls, false));
             }
             
             if (networkUrls.length > 0) {
-                html += '<div class="url-section">';
-                html += '<div class="url-section-title">🌐 局域网访问 - 可供其他设备访问</div>';
-                networkUrls.forEach(item => {
-                    html += `
-                        <div class="url-item">
-                            <div class="url-interface">${item.interface}</div>
-                            <div class="url-link">
-                                <span>${item.url}</span>
-                                <button class="copy-btn" onclick="copyToClipboard('${item.url}', this)">复制</button>
+                fragment.appendChild(createUrlSection('🌐 局域网访问 - 可供其他设备访问', networkUrls, true));
+            }
+            
+            if (localUrls.length === 0 && networkUrls.length === 0) {
+                const empty = document.createElement('div');
+                empty.style.cssText = 'text-align: center; padding: 20px; color: #999;';
+                empty.textContent = '暂无可用地址';
+                fragment.appendChild(empty);
+            }
+            
+            urlList.replaceChildren(fragment);
+        }
+        
+        // 连接列表行缓存：client_id -> {el, fields, values}，轮询时只改动变化了的文字，不重建整个列表
+        const connectionsListEl = document.getElementById('connectionsList');
+        const emptyStateEl = connectionsListEl.querySelector('.empty-state');
+        const rowCache = new Map();
+        
+        function createConnectionRow() {
+            const el = document.createElement('div');
+            el.className = 'connection-item';
+            el.innerHTML = `
+                <div class="connection-header">
+                    <div class="client-ip" data-field="address"></div>
+                    <div class="connection-time" data-field="lastSeen"></div>
+                </div>
+                <div class="connection-details">
+                    <div class="detail-item">
+                        <div class="detail-label">客户端ID</div>
+                        <div class="detail-value" data-field="clientId"></div>
+                    </div>
+                    <div class="detail-item">
+                        <div class="detail-label">服务器接口</div>
+                        <div class="detail-value" data-field="interface"></div>
+                    </div>
+                    <div class="detail-item">
+                        <div class="detail-label">服务器IP</div>
+                        <div class="detail-value" data-field="serverIp"></div>
+                    </div>
+                    <div class="detail-item">
+                        <div class="detail-label">播放视频</div>
+                        <div class="detail-value" data-field="video"></div>
+                    </div>
+                    <div class="detail-item">
+                        <div class="detail-label">播放进度</div>
+                        <div class="detail-value">
+                            <span data-field="progress"></span>
+                            <div class="progress-bar">
+                                <div class="progress-fill" data-field="progressFill"></div>
                             </div>
                         </div>
-                    `;
-                });
-                html += '</div>';
+                    </div>
+                    <div class="detail-item">
+                        <div class="detail-label">下载速率</div>
+                        <div class="detail-value" data-field="bandwidthDown"></div>
+                    </div>
+                    <div class="detail-item">
+                        <div class="detail-label">上传速率</div>
+                        <div class="detail-value" data-field="bandwidthUp"></div>
+                    </div>
+                    <div class="detail-item">
+                        <div class="detail-label">连接时间</div>
+                        <div class="detail-value" data-field="connectedAt"></div>
+                    </div>
+                </div>
+            `;
+            const fields = {};
+            el.querySelectorAll('[data-field]').forEach(f => {
+                fields[f.dataset.field] = f;
+            });
+            return { el, fields, values: {} };
+        }
+        
+        // 值与上次相同时不写DOM
+        function setRowText(row, name, value) {
+            if (row.values[name] !== value) {
+                row.values[name] = value;
+                row.fields[name].textContent = value;
             }
+        }
+        
+        function updateConnectionRow(row, conn, now) {
+            const progress = conn.duration > 0 ? (conn.position / conn.duration * 100).toFixed(1) : 0;
+            const progressWidth = Math.min(100, Math.max(0, progress)) + '%';
             
-            if (localUrls.length === 0 && networkUrls.length === 0) {
-                html = '<div style="text-align: center; padding: 20px; color: #999;">暂无可用地址</div>';
+            setRowText(row, 'address', `🖥️ ${conn.client_ip}:${conn.client_port}`);
+            row.lastSeen = conn.last_seen;
+            setRowText(row, 'lastSeen', formatDuration(conn.last_seen, now));
+            setRowText(row, 'clientId', conn.client_id);
+            setRowText(row, 'interface', conn.interface);
+            setRowText(row, 'serverIp', conn.server_ip);
+            setRowText(row, 'video', conn.video);
+            setRowText(row, 'progress', `${progress}% (${formatTime(conn.position)} / ${formatTime(conn.duration)})`);
+            setRowText(row, 'bandwidthDown', `${conn.bandwidth_down.toFixed(2)} KB/s`);
+            setRowText(row, 'bandwidthUp', `${conn.bandwidth_up.toFixed(2)} KB/s`);
+            setRowText(row, 'connectedAt', conn.connected_at);
+            if (row.values.progressWidth !== progressWidth) {
+                row.values.progressWidth = progressWidth;
+                row.fields.progressFill.style.width = progressWidth;
+            }
+        }
+        
+        function renderConnections(connections) {
+            emptyStateEl.style.display = connections.length === 0 ? '' : 'none';
+            const now = Date.now();
+            
+            // 按服务器返回的顺序排列各行，位置没变的行不移动
+            const seen = new Set();
+            let prev = emptyStateEl;
+            connections.forEach(conn => {
+                let row = rowCache.get(conn.client_id);
+                if (!row) {
+                    row = createConnectionRow();
+                    rowCache.set(conn.client_id, row);
+                }
+                updateConnectionRow(row, conn, now);
+                if (prev.nextSibling !== row.el) {
+                    connectionsListEl.insertBefore(row.el, prev.nextSibling);
+                }
+                prev = row.el;
+                seen.add(conn.client_id);
+            });
+            
+            // 移除已断开的客户端
+            rowCache.forEach((row, clientId) => {
+                if (!seen.has(clientId)) {
+                    row.el.remove();
+                    rowCache.delete(clientId);
+                }
+            });
+        }
+        
+        // "N秒前"是相对当前时间计算的，数据没有变化（304）时也要随时间刷新
+        function refreshLastSeen() {
+            const now = Date.now();
+            rowCache.forEach(row => {
+                setRowText(row, 'lastSeen', formatDuration(row.lastSeen, now));
+            });
+        }
+        
+        let lastSeenTimer = null;
+        
+        function startLastSeenTimer() {
+            if (!lastSeenTimer) {
+                lastSeenTimer = setInterval(refreshLastSeen, 1000);
+            }
+        }
+        
+        function stopLastSeenTimer() {
+            if (lastSeenTimer) {
+                clearInterval(lastSeenTimer);
+                lastSeenTimer = null;
+            }
+        }
+        
+        // 自己保存ETag并带上If-None-Match，数据未变化时服务器返回304，不再解析和重绘
+        let monitorEtag = null;
+        
+        // 网络部分：只负责请求和ETag，返回数据（304时为null）
+        function fetchMonitor() {
+            const headers = monitorEtag ? { 'If-None-Match': monitorEtag } : {};
+            return fetch('/monitor-data', { cache: 'no-store', headers: headers })
+                .then(r => {
+                    if (r.status === 304) {
+                        // 数据未变化，放慢下一次刷新
+                        pollInterval = Math.min(MAX_POLL_INTERVAL, pollInterval * 1.5);
+                        return null;
+                    }
+                    pollInterval = MIN_POLL_INTERVAL;
+                    monitorEtag = r.headers.get('ETag');
+                    return r.json();
+                });
+        }
+        
+        // DOM部分：只负责把数据写到页面上
+        function applyMonitor(data) {
+            // 缓存访问地址
+            if (data.access_urls) {
+                cachedAccessUrls = data.access_urls;
             }
             
-            urlList.innerHTML = html;
+            // 更新统计数据
+            document.getElementById('activeConnections').textContent = data.active_count;
+            document.getElementById('totalClients').textContent = data.total_clients;
+            
+            // 更新连接列表
+            renderConnections(data.connections);
         }
         
         function updateMonitor() {
-            fetch('/monitor-data')
-                .then(r => r.json())
+            return fetchMonitor()
                 .then(data => {
-                    // 缓存访问地址
-                    if (data.access_urls) {
-                        cachedAccessUrls = data.access_urls;
-                    }
-                    
-                    // 更新统计数据
-                    document.getElementById('activeConnections').textContent = data.active_count;
-                    document.getElementById('totalClients').textContent = data.total_clients;
-                    
-                    // 更新连接列表
-                    const listEl = document.getElementById('connectionsList');
-                    
-                    if (data.connections.length === 0) {
-                        listEl.innerHTML = `
-                            <div class="empty-state">
-                                <div class="empty-state-icon">🔌</div>
-                                <div>当前没有活动连接</div>
-                            </div>
-                        `;
-                    } else {
-                        listEl.innerHTML = data.connections.map(conn => {
-                            const progress = conn.duration > 0 ? (conn.position / conn.duration * 100).toFixed(1) : 0;
-                            const progressWidth = Math.min(100, Math.max(0, progress));
-                            
-                            return `
-                                <div class="connection-item">
-                                    <div class="connection-header">
-                                        <div class="client-ip">🖥️ ${conn.client_ip}:${conn.client_port}</div>
-                                        <div class="connection-time">${formatDuration(conn.last_seen)}</div>
-                                    </div>
-                                    <div class="connection-details">
-                                        <div class="detail-item">
-                                            <div class="detail-label">客户端ID</div>
-                                            <div class="detail-value">${conn.client_id}</div>
-                                        </div>
-                                        <div class="detail-item">
-                                            <div class="detail-label">服务器接口</div>
-                                            <div class="detail-value">${conn.interface}</div>
-                                        </div>
-                                        <div class="detail-item">
-                                            <div class="detail-label">服务器IP</div>
-                                            <div class="detail-value">${conn.server_ip}</div>
-                                        </div>
-                                        <div class="detail-item">
-                                            <div class="detail-label">播放视频</div>
-                                            <div class="detail-value">${conn.video}</div>
-                                        </div>
-                                        <div class="detail-item">
-                                            <div class="detail-label">播放进度</div>
-                                            <div class="detail-value">
-                                                ${progress}% (${formatTime(conn.position)} / ${formatTime(conn.duration)})
-                                                <div class="progress-bar">
-                                                    <div class="progress-fill" style="width: ${progressWidth}%"></div>
-                                                </div>
-                                            </div>
-                                        </div>
-                                        <div class="detail-item">
-                                            <div class="detail-label">下载速率</div>
-                                            <div class="detail-value">${conn.bandwidth_down.toFixed(2)} KB/s</div>
-                                        </div>
-                                        <div class="detail-item">
-                                            <div class="detail-label">上传速率</div>
-                                            <div class="detail-value">${conn.bandwidth_up.toFixed(2)} KB/s</div>
-                                        </div>
-                                        <div class="detail-item">
-                                            <div class="detail-label">连接时间</div>
-                                            <div class="detail-value">${conn.connected_at}</div>
-                                        </div>
-                                    </div>
-                                </div>
-                            `;
-                        }).join('');
+                    if (!data) return;
+                    if (document.hidden) {
+                        // 页面已隐藏，这次数据不绘制；清掉ETag，恢复可见后拿到完整数据
+                        monitorEtag = null;
+                        return;
                     }
+                    // 放到下一帧统一写DOM，避免在帧中间触发重排
+                    requestAnimationFrame(() => applyMonitor(data));
                 })
                 .catch(err => {
                     console.error('Failed to update monitor:', err);
@@ -2523,19 +3040,30 @@ def monitor():
         updateMonitor();
         
         // 优化4：智能刷新 - 页面可见时才刷新，降低CPU和网络开销
-        let updateInterval = null;
+        // 每次请求完成后再安排下一次，间隔随数据是否变化在3秒到15秒之间调整
+        const MIN_POLL_INTERVAL = 3000;
+        const MAX_POLL_INTERVAL = 15000;
+        let pollInterval = MIN_POLL_INTERVAL;
+        let updateTimer = null;
         let isPageVisible = true;
         
+        function pollMonitor() {
+            updateTimer = null;
+            updateMonitor().then(() => {
+                if (!document.hidden) startUpdating();
+            });
+        }
+        
         function startUpdating() {
-            if (!updateInterval) {
-                updateInterval = setInterval(updateMonitor, 3000);  // 从2秒改为3秒
+            if (!updateTimer) {
+                updateTimer = setTimeout(pollMonitor, pollInterval);
             }
         }
         
         function stopUpdating() {
-            if (updateInterval) {
-                clearInterval(updateInterval);
-                updateInterval = null;
+            if (updateTimer) {
+                clearTimeout(updateTimer);
+                updateTimer = null;
             }
         }
         
@@ -2543,30 +3071,54 @@ def monitor():
         document.addEventListener('visibilitychange', function() {
             if (document.hidden) {
                 stopUpdating();
+                stopLastSeenTimer();
                 isPageVisible = false;
             } else {
-                updateMonitor();  // 立即更新一次
-                startUpdating();
+                // 立即更新一次，完成后由pollMonitor安排下一次，不再另起定时器
+                stopUpdating();
+                pollMonitor();
+                refreshLastSeen();
+                startLastSeenTimer();
                 isPageVisible = true;
             }
         });
         
         // 启动定时更新
         startUpdating();
+        startLastSeenTimer();
         
         // ESC键关闭弹窗
         document.addEventListener('keydown', function(event) {
             if (event.key === 'Escape' || event.key === 'Esc') {
-                const modal = document.getElementById('urlModal');
-                if (modal.classList.contains('show')) {
-                    modal.classList.remove('show');
-                }
+                closeModal();
             }
         });
     </script>
 </body>
 </html>
-''', port=PORT)
+'''
+
+monitor_page_bytes = app.jinja_env.from_string(MONITOR_TEMPLATE).render(port=PORT).encode('utf-8')
+monitor_page_gzip = gzip.compress(monitor_page_bytes, 9)
+
+@app.route('/monitor')
+def monitor():
+    """监控页面：显示服务器运行状态和连接信息"""
+    if MONITOR_USERNAME and MONITOR_PASSWORD:
+        auth = request.authorization
+        if not auth or auth.username != MONITOR_USERNAME or auth.password != MONITOR_PASSWORD:
+            return ('认证失败', 401, {
+                'WWW-Authenticate': 'Basic realm="Monitor Login Required"'
+            })
+    
+    if 'gzip' in request.headers.get('Accept-Encoding', ''):
+        response = app.response_class(monitor_page_gzip, mimetype='text/html')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = app.response_class(monitor_page_bytes, mimetype='text/html')
+    
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
 
 # 监控数据API
 @app.route('/monitor-data')
@@ -2578,51 +3130,30 @@ def monitor_data():
         if not auth or auth.username != MONITOR_USERNAME or auth.password != MONITOR_PASSWORD:
             return jsonify({'error': '认证失败'}), 401
     
-    # 清理过期连接，确保监控数据准确
+    # 清理过期连接并复制当前活跃连接，锁内只取属性元组，排序和组装dict放到锁外进行
     current_time = time.time()
     with connection_lock:
-        expired = [client_id for client_id, info in active_connections.items() 
-                  if current_time - info.get('last_seen', 0) > CONNECTION_TIMEOUT]
-        
-        if expired:
-            for client_id in expired:
-                del active_connections[client_id]
+        remove_expired_connections(current_time)
+        snapshot = [(info.seq, info.snapshot()) for info in active_connections.values()]
     
-    # 获取当前活跃连接的快照
-    connections_snapshot = []
-    with connection_lock:
-        for client_id, info in active_connections.items():
-            connections_snapshot.append({
-                'client_id': client_id,
-                'client_ip': info.get('client_ip', 'N/A'),
-                'client_port': info.get('client_port', 'N/A'),
-                'server_ip': info.get('server_ip', 'N/A'),
-                'interface': info.get('interface', 'N/A'),
-                'video': info.get('video', '未播放'),
-                'position': info.get('position', 0),
-                'duration': info.get('duration', 0),
-                'bandwidth_down': info.get('bandwidth_down', 0),
-                'bandwidth_up': info.get('bandwidth_up', 0),
-                'last_seen': info.get('last_seen', 0),
-                'connected_at': info.get('connected_at', 'N/A')
-            })
+    # active_connections按心跳先后排列（供过期清理使用），监控页按注册顺序显示，行不会随心跳来回跳动
+    snapshot.sort(key=lambda item: item[0])
+    fields = ConnectionInfo.FIELDS
+    connections_snapshot = [dict(zip(fields, values)) for _, values in snapshot]
     
-    # 获取所有可访问的IP地址（在锁外执行）
-    ip_addresses = get_all_ip_addresses()
-    access_urls = []
-    for interface, ip in ip_addresses:
-        access_urls.append({
-            'interface': interface,
-            'ip': ip,
-            'url': f'http://{ip}:{PORT}'
-        })
+    # 所有可访问的地址（缓存，在锁外获取）
+    access_urls = get_access_urls()
     
-    return jsonify({
+    payload = orjson.dumps({
         'active_count': len(connections_snapshot),
         'total_clients': len(connections_snapshot),
         'connections': connections_snapshot,
         'access_urls': access_urls
     })
+    
+    # 服务器空闲时大多数轮询的数据不变，内容摘要与客户端缓存一致时返回304，不再发送正文
+    etag = hashlib.blake2b(payload, digest_size=8).hexdigest()
+    return not_modified_or(etag, lambda: payload)
 
 @app.route('/videos')
 def videos():
@@ -2630,7 +3161,10 @@ def videos():
     secret_token = request.args.get('secretnumber', '')
     is_secret = is_token_valid(secret_token)
     
-    return jsonify(get_video_list(is_secret=is_secret))
+    video_files, etag = get_video_list_with_etag(is_secret=is_secret)
+    
+    # 列表未变化时返回304，不再序列化和传输整个列表
+    return not_modified_or(etag, lambda: orjson.dumps(video_files))
 
 @app.route('/video/<path:filename>')
 def video(filename):
@@ -2641,106 +3175,193 @@ def video(filename):
     video_root = SECRET_VIDEO_ROOT if is_secret else VIDEO_ROOT
     file_path = os.path.join(video_root, filename)
     
-    if not os.path.isfile(file_path):
+    try:
+        st = cached_stat(file_path, int(time.time()) // STAT_CACHE_SECONDS)
+    except OSError:
+        return 'File not found', 404
+    if not stat.S_ISREG(st.st_mode):
         return 'File not found', 404
 
-    ext = os.path.splitext(filename)[1].lower()
-    mime_types = {
-        '.mp4': 'video/mp4',
-        '.webm': 'video/webm',
-        '.ogg': 'video/ogg',
-        '.mkv': 'video/x-matroska',
-        '.rmvb': 'application/vnd.rn-realmedia-vbr',
-        '.avi': 'video/x-msvideo',
-        '.flv': 'video/x-flv',
-        '.mov': 'video/quicktime'
+    _, dot, ext = filename.rpartition('.')
+    mimetype = MIME_TYPES.get(ext.lower(), 'video/mp4') if dot else 'video/mp4'
+    
+    size = st.st_size
+    
+    # 由inode、大小和修改时间生成强ETag，文件替换后自动失效
+    etag = f'{st.st_ino:x}-{size:x}-{st.st_mtime_ns:x}'
+    last_modified = http_date(st.st_mtime)
+    cache_headers = {
+        'Accept-Ranges': 'bytes',
+        'ETag': quote_etag(etag),
+        'Last-Modified': last_modified,
+        # 隐私视频不能留在浏览器缓存里，否则Token失效后仍可从缓存播放
+        'Cache-Control': 'no-store' if is_secret else 'private, max-age=3600'
     }
-    mimetype = mime_types.get(ext, 'video/mp4')
     
-    size = os.path.getsize(file_path)
-    range_header = request.headers.get('Range', None)
+    # 客户端缓存仍然有效时直接返回304，不发送文件内容
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return app.response_class(status=304, headers=cache_headers)
     
-    if not range_header:
-        def generate_full():
-            """生成完整文件流"""
-            try:
-                with open(file_path, 'rb') as f:
-                    while True:
-                        data = f.read(CHUNK_SIZE)
-                        if not data:
-                            break
-                        yield data
-            except IOError as e:
-                yield b''
+    # HEAD探测只返回头部，不打开文件
+    if request.method == 'HEAD':
+        return app.response_class(
+            status=200,
+            mimetype=mimetype,
+            headers={
+                **cache_headers,
+                'Content-Length': str(size)
+            }
+        )
+    
+    # Range由werkzeug解析；无法解析、不是单一字节区间，或If-Range与当前文件不符
+    # （文件已被替换，客户端手里的前半段已失效）时，按完整文件返回
+    byte_range = request.range
+    if_range = request.headers.get('If-Range')
+    if if_range and if_range not in (cache_headers['ETag'], last_modified):
+        byte_range = None
+    
+    if byte_range is None or byte_range.units != 'bytes' or len(byte_range.ranges) != 1:
+        try:
+            body = open_file_stream(file_path, 0, size, size)
+        except OSError:
+            return 'File not found', 404
         
         return app.response_class(
-            generate_full(),
+            body,
             200,
             mimetype=mimetype,
             headers={
-                'Content-Length': str(size),
-                'Accept-Ranges': 'bytes'
-            }
+                **cache_headers,
+                'Content-Length': str(size)
+            },
+            direct_passthrough=True
         )
     
-    byte1, byte2 = 0, size - 1
-    m = range_header.replace('bytes=', '').split('-')
-    if m[0]: 
-        byte1 = int(m[0])
-    if m[1]: 
-        byte2 = int(m[1])
+    # 支持"bytes=-500"这样的后缀区间；起点超出文件大小时返回416
+    span = byte_range.range_for_length(size)
+    if span is None:
+        return app.response_class(
+            status=416,
+            headers={
+                **cache_headers,
+                'Content-Range': f'bytes */{size}'
+            }
+        )
     
-    byte1 = max(0, min(byte1, size - 1))
-    byte2 = max(byte1, min(byte2, size - 1))
-    length = byte2 - byte1 + 1
+    byte1, end = span
+    byte2 = end - 1
+    length = end - byte1
     
-    def generate_range():
-        try:
-            with open(file_path, 'rb') as f:
-                f.seek(byte1)  # 定位到起始位置
-                remaining = length
-                
-                while remaining > 0:
-                    # 计算本次读取大小（最后一块可能小于CHUNK_SIZE）
-                    chunk_size = min(CHUNK_SIZE, remaining)
-                    data = f.read(chunk_size)
-                    
-                    if not data:
-                        break  # 文件意外结束
-                    
-                    remaining -= len(data)
-                    yield data  # 发送数据块
-        except IOError as e:
-            yield b''
+    try:
+        body = open_file_stream(file_path, byte1, length, size)
+    except OSError:
+        return 'File not found', 404
     
     # 返回206 Partial Content响应
     return app.response_class(
-        generate_range(),
+        body,
         206,
         mimetype=mimetype,
         headers={
+            **cache_headers,
             'Content-Range': f'bytes {byte1}-{byte2}/{size}',
-            'Accept-Ranges': 'bytes',
             'Content-Length': str(length)
-        }
+        },
+        direct_passthrough=True
     )
 
+# 播放时同一文件会连续收到大量Range请求，stat结果按5秒分段缓存
+STAT_CACHE_SECONDS = 5
+
+@functools.lru_cache(maxsize=1024)
+def cached_stat(path, bucket):
+    """os.stat的缓存版本，bucket变化（每STAT_CACHE_SECONDS秒）后重新获取；出错时不缓存"""
+    return os.stat(path)
+
+def open_file_stream(file_path, offset, length, size):
+    """打开视频文件并定位，返回发送指定区间的响应体
+    
+    区间一直到文件末尾时交给WSGI服务器的file_wrapper（waitress会把文件直接挂到
+    发送缓冲区，由I/O主循环发送，不再经过Python生成器逐块转发）。waitress的file_wrapper
+    只发送Content-Length指定的字节数，因此有结束位置的区间同样可以交给它；
+    其他服务器的file_wrapper会一直读到文件末尾，这种情况下按块读取。
+    """
+    f = open(file_path, 'rb')
+    f.seek(offset)
+    
+    # 提示内核按顺序读取该区间，加大预读（仅支持posix_fadvise的平台）
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(f.fileno(), offset, length, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+    
+    file_wrapper = request.environ.get('wsgi.file_wrapper')
+    if file_wrapper is not None and (offset + length == size or file_wrapper is ReadOnlyFileBasedBuffer):
+        return file_wrapper(f, CHUNK_SIZE)
+    
+    return generate_file_chunks(f, length)
+
+def generate_file_chunks(f, length):
+    """从当前位置按CHUNK_SIZE分块读取length字节，结束后关闭文件"""
+    try:
+        remaining = length
+        while remaining > 0:
+            # 计算本次读取大小（最后一块可能小于CHUNK_SIZE）
+            data = f.read(min(CHUNK_SIZE, remaining))
+            if not data:
+                break  # 文件意外结束
+            remaining -= len(data)
+            yield data
+    except IOError:
+        yield b''
+    finally:
+        f.close()
+
 def show_message_box(title, message, style):
     """显示Windows消息框"""
     return ctypes.windll.user32.MessageBoxW(0, message, title, style)
 
+# 本机IP地址缓存：网卡很少变化，监控页每次轮询直接复用
+# 内容为(IP地址列表, 访问地址列表)，两者在同一次刷新中生成
+ip_addresses_cache = None
+ip_addresses_cache_time = 0
+IP_ADDRESSES_CACHE_EXPIRE = 30
+
+def get_ip_addresses_cache():
+    """返回(IP地址列表, 访问地址列表)，缓存超过IP_ADDRESSES_CACHE_EXPIRE秒后重新枚举"""
+    global ip_addresses_cache, ip_addresses_cache_time
+    now = time.monotonic()
+    if ip_addresses_cache is None or now - ip_addresses_cache_time > IP_ADDRESSES_CACHE_EXPIRE:
+        ip_addresses = tuple(scan_ip_addresses())
+        access_urls = tuple({
+            'interface': interface,
+            'ip': ip,
+            'url': f'http://{ip}:{PORT}'
+        } for interface, ip in ip_addresses)
+        ip_addresses_cache = (ip_addresses, access_urls)
+        ip_addresses_cache_time = now
+    return ip_addresses_cache
+
 def get_all_ip_addresses():
-    """获取本机所有可用IP地址"""
+    """获取本机所有可用IP地址（缓存）"""
+    return get_ip_addresses_cache()[0]
+
+def get_access_urls():
+    """获取本机各IP对应的访问地址（缓存）"""
+    return get_ip_addresses_cache()[1]
+
+def scan_ip_addresses():
+    """枚举本机所有可用IP地址"""
     ip_list = []
     
     ip_list.append(("本地回环地址", "127.0.0.1"))
     ip_list.append(("本地回环地址", "localhost"))
     
     try:
-        for interface_name, interface_addresses in psutil.net_if_addrs().items():
-            for address in interface_addresses:
-                if address.family == socket.AF_INET and not address.address.startswith('127.'):
-                    ip_list.append((interface_name, address.address))
+        for interface_name, ip in enum_ipv4_interfaces():
+            if not ip.startswith('127.'):
+                ip_list.append((interface_name, ip))
     except Exception:
         try:
             hostname = socket.gethostname()
@@ -2752,13 +3373,55 @@ def get_all_ip_addresses():
     
     return ip_list
 
+# GetExtendedTcpTable的参数和返回值（iphlpapi.h / winerror.h）
+TCP_TABLE_OWNER_PID_LISTENER = 3
+ERROR_INSUFFICIENT_BUFFER = 122
+
+class MIB_TCPROW_OWNER_PID(ctypes.Structure):
+    _fields_ = [(name, ctypes.c_uint32) for name in (
+        'dwState', 'dwLocalAddr', 'dwLocalPort', 'dwRemoteAddr', 'dwRemotePort', 'dwOwningPid')]
+
+def get_listening_pid_win32(port):
+    """通过iphlpapi的GetExtendedTcpTable只查询处于监听状态的IPv4连接，不启动netstat子进程"""
+    get_table = ctypes.windll.iphlpapi.GetExtendedTcpTable
+    size = ctypes.c_uint32(0)
+    buf = None
+    # 第一次调用获取所需大小；两次调用之间表可能变大，最多重试几次
+    for _ in range(3):
+        ret = get_table(buf, ctypes.byref(size), False, socket.AF_INET, TCP_TABLE_OWNER_PID_LISTENER, 0)
+        if ret == 0 and buf is not None:
+            break
+        if ret not in (0, ERROR_INSUFFICIENT_BUFFER):
+            return None
+        buf = ctypes.create_string_buffer(size.value)
+    else:
+        return None
+    
+    # 表头是一个DWORD的行数，后面紧跟各行；端口以网络字节序存放在低16位
+    count = ctypes.c_uint32.from_buffer(buf).value
+    rows = (MIB_TCPROW_OWNER_PID * count).from_buffer(buf, ctypes.sizeof(ctypes.c_uint32))
+    target = socket.htons(port)
+    for row in rows:
+        if row.dwLocalPort & 0xFFFF == target:
+            return row.dwOwningPid
+    return None
+
 def get_pid_by_port(port):
     """根据端口号获取占用进程的PID"""
+    if os.name == 'nt':
+        try:
+            pid = get_listening_pid_win32(port)
+            if pid is not None:
+                return pid
+        except (OSError, AttributeError):
+            pass
+    
     try:
         for conn in psutil.net_connections(kind='inet'):
             if conn.laddr.port == port and conn.status == 'LISTEN':
                 return conn.pid
     except (psutil.AccessDenied, PermissionError):
+        # 最后手段：解析netstat输出
         try:
             import subprocess
             result = subprocess.run(['netstat', '-ano'], capture_output=True, text=True)
@@ -2774,8 +3437,26 @@ def get_pid_by_port(port):
             pass
     return None
 
+def port_is_free(port):
+    """尝试绑定端口判断是否空闲，只需一次系统调用，不必枚举系统中所有连接"""
+    probe = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        # Windows上的SO_REUSEADDR允许抢占已被监听的端口，只在其他系统上用来忽略TIME_WAIT
+        if os.name != 'nt':
+            probe.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        probe.bind(('0.0.0.0', port))
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
 def check_port_available(port):
     """检查端口可用性并智能处理冲突"""
+    # 常见情况：端口空闲，直接启动；只有绑定失败时才去查找占用端口的进程
+    if port_is_free(port):
+        return True
+    
     pid = get_pid_by_port(port)
     
     if pid is None:
@@ -2815,6 +3496,18 @@ def check_port_available(port):
     show_message_box("视频服务器 - 端口被占用", message, 16)
     sys.exit(1)
 
+def create_server_socket(port):
+    """创建监听socket并调大发送缓冲区
+    
+    waitress每次按连接的SO_SNDBUF大小从视频文件读取并发送，客户端连接会继承
+    监听socket的缓冲区设置，调到CHUNK_SIZE可以减少传输视频时的读写次数
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, CHUNK_SIZE)
+    sock.bind(('0.0.0.0', port))
+    return sock
+
 def check_and_kill_existing_process():
     """启动前检查并处理端口占用"""
     check_port_available(PORT)
@@ -2896,13 +3589,13 @@ def setup_tray_icon():
     )
     
     def update_tooltip():
-        """定期更新托盘图标提示信息"""
-    def update_tooltip():
-        """定期更新托盘图标提示信息"""
+        """连接数变化时更新托盘图标提示信息，空闲时最多30秒醒来一次"""
         while True:
             try:
                 tray_icon.title = f"视频服务器\n{get_connection_status()}"
-                time.sleep(5)
+                connections_changed.wait(timeout=30)
+                # 先清除再读取状态，读取期间发生的变化会让下一次wait立即返回
+                connections_changed.clear()
             except:
                 break
     
@@ -2922,17 +3615,26 @@ if __name__ == '__main__':
     
     # 根据CPU核心数优化线程数
     try:
-        cpu_count = multiprocessing.cpu_count()
+        cpu_count = os.cpu_count()
         optimal_threads = max(6, min(48, cpu_count * 3))
     except:
         optimal_threads = 12
     
+    # 启动时预先扫描视频目录和网卡信息，首个请求无需等待扫描
+    get_video_list()
+    get_video_list(is_secret=True)
+    refresh_interface_cache()
+    
     try:
         cleanup_thread = threading.Thread(target=cleanup_expired_connections, daemon=True)
         cleanup_thread.start()
         
         def run_flask():
-            serve(app, host='0.0.0.0', port=PORT, threads=optimal_threads, channel_timeout=180)
+            # 视频文件交给waitress的I/O主循环发送，空闲的长连接只占用文件描述符；
+            # 有poll()的平台改用poll，不受select()的FD_SETSIZE限制
+            serve(app, sockets=[create_server_socket(PORT)], threads=optimal_threads, channel_timeout=180,
+                  connection_limit=SERVER_CONNECTION_LIMIT, cleanup_interval=30,
+                  asyncore_use_poll=hasattr(select, 'poll'))
         
         flask_thread = threading.Thread(target=run_flask, daemon=True)
         flask_thread.start()